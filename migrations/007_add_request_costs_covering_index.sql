@@ -0,0 +1,21 @@
+-- Migration: 007_add_request_costs_covering_index
+-- Description: Add covering index so daily cost rollups are index-only range scans
+-- Date: 2026-10-18
+
+BEGIN TRANSACTION;
+
+-- Covers every column read by CostTrackingDB.get_daily_costs(), so the
+-- timestamp range scan never has to visit the request_costs table itself
+CREATE INDEX IF NOT EXISTS idx_request_costs_ts_cost
+    ON request_costs(timestamp, model, input_tokens, output_tokens, total_cost);
+
+-- The covering index leads with timestamp, so it serves every lookup the
+-- single-column timestamp index did; drop that one rather than maintain
+-- both on each insert
+DROP INDEX IF EXISTS idx_request_costs_timestamp;
+
+-- Insert migration record
+INSERT INTO migration_log (migration_id, applied_at, description)
+VALUES ('007_add_request_costs_covering_index', datetime('now'), 'Add covering index so daily cost rollups are index-only range scans');
+
+COMMIT;
@@ -0,0 +1,14 @@
+-- Rollback Migration: 007_add_request_costs_covering_index
+-- Description: Remove the daily cost rollup covering index and restore the timestamp index
+-- Date: 2026-10-18
+
+BEGIN TRANSACTION;
+
+-- Restore the single-column timestamp index, then drop the covering index
+CREATE INDEX IF NOT EXISTS idx_request_costs_timestamp ON request_costs(timestamp);
+DROP INDEX IF EXISTS idx_request_costs_ts_cost;
+
+-- Remove migration record
+DELETE FROM migration_log WHERE migration_id = '007_add_request_costs_covering_index';
+
+COMMIT;
@@ -6,6 +6,7 @@ Handles environment variables and configuration loading
 import os
 import json
 import logging
+from functools import lru_cache
 from typing import Dict, Any
 from dotenv import load_dotenv
 
@@ -122,4 +123,10 @@ class Configuration:
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value by key with optional default."""
-        return self.config.get(key, default)
\ No newline at end of file
+        return self.config.get(key, default)
+
+
+@lru_cache(maxsize=None)
+def get_config() -> Configuration:
+    """Return a process-wide cached Configuration"""
+    return Configuration()
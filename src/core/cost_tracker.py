@@ -82,6 +82,30 @@ class RequestCost:
         self.total_cost = input_cost + output_cost
         self.timestamp = timestamp or datetime.now()
     
+    @classmethod
+    def calculate(cls, model_cost: ModelCost, input_tokens: int, output_tokens: int,
+                  session_id: str = '') -> 'RequestCost':
+        """Price a single request against a model's cost structure"""
+        costs = model_cost.calculate_cost(input_tokens, output_tokens)
+        return cls(
+            session_id=session_id,
+            model=model_cost.model_name,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            input_cost=costs['input_cost'],
+            output_cost=costs['output_cost']
+        )
+    
+    @classmethod
+    def calculate_batch(cls, model_cost: ModelCost, input_tokens, output_tokens):
+        """Price many requests for one model in one vectorized pass (returns a numpy array of totals)"""
+        import numpy as np  # Only bulk callers need NumPy
+        
+        in_toks = np.asarray(input_tokens, dtype=np.int64)
+        out_toks = np.asarray(output_tokens, dtype=np.int64)
+        return (in_toks * float(model_cost.input_cost_per_1k) +
+                out_toks * float(model_cost.output_cost_per_1k)) * 1e-3
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary representation"""
         return {
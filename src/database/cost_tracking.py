@@ -8,12 +8,17 @@ import json
 import time
 import hashlib
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, Iterable, List, Any, Optional, Tuple
 from functools import lru_cache, wraps
 import logging
 from pathlib import Path
 from decimal import Decimal
 
+try:
+    import orjson
+except ImportError:  # Optional fast serializer; fall back to the json module
+    orjson = None
+
 from .chat_storage import ChatDatabase
 
 logger = logging.getLogger(__name__)
@@ -34,22 +39,20 @@ class CostTrackingDB(ChatDatabase):
     
     def _configure_sqlite_optimizations(self):
         """Configure SQLite for optimal performance with cost tracking"""
-        cursor = self.conn.cursor()
-        
-        # Enable Write-Ahead Logging for better concurrency
-        cursor.execute("PRAGMA journal_mode = WAL")
-        
-        # Set synchronous mode for balance between safety and performance
-        cursor.execute("PRAGMA synchronous = NORMAL")
-        
-        # Enable foreign key constraints
-        cursor.execute("PRAGMA foreign_keys = ON")
-        
-        # Set cache size (negative value = KB)
-        cursor.execute("PRAGMA cache_size = -10000")
-        
-        # Enable query planner optimizations
-        cursor.execute("PRAGMA optimize")
+        # Issue all connection PRAGMAs in a single round trip:
+        # - WAL journaling for concurrent readers and cheaper commits
+        # - NORMAL sync, which is durable enough under WAL
+        # - temp tables/indices in memory, 64MB page cache, 256MB mmap window
+        # - foreign key enforcement and query planner optimizations
+        self.conn.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            PRAGMA temp_store = MEMORY;
+            PRAGMA cache_size = -65536;
+            PRAGMA mmap_size = 268435456;
+            PRAGMA foreign_keys = ON;
+            PRAGMA optimize;
+        """)
         
         logger.info("SQLite optimizations configured for cost tracking")
     
@@ -185,31 +188,69 @@ class CostTrackingDB(ChatDatabase):
             'context_window': 4096
         }
     
-    def log_request_cost(self, session_id: str, model: str, 
-                        input_tokens: int, output_tokens: int,
-                        provider: Optional[str] = None) -> None:
-        """Log the cost of a single API request"""
-        model_costs = self._get_model_costs(model, provider)
-        
+    def _calculate_request_cost(self, model_costs: Dict[str, float],
+                                input_tokens: int, output_tokens: int) -> Tuple[float, float, float]:
+        """Calculate (input_cost, output_cost, total_cost) for a request"""
         # Calculate costs using Decimal for precision
         input_cost = float(Decimal(str(input_tokens)) / Decimal('1000') * 
                           Decimal(str(model_costs['input_cost_per_1k'])))
         output_cost = float(Decimal(str(output_tokens)) / Decimal('1000') * 
                            Decimal(str(model_costs['output_cost_per_1k'])))
         total_cost = float(Decimal(str(input_cost)) + Decimal(str(output_cost)))
+        return input_cost, output_cost, total_cost
+    
+    def log_request_cost(self, session_id: str, model: str, 
+                        input_tokens: int, output_tokens: int,
+                        provider: Optional[str] = None,
+                        ts: Optional[float] = None) -> None:
+        """Log the cost of a single API request (ts: optional Unix time, default CURRENT_TIMESTAMP)"""
+        model_costs = self._get_model_costs(model, provider)
+        input_cost, output_cost, total_cost = self._calculate_request_cost(
+            model_costs, input_tokens, output_tokens
+        )
         
         cursor = self.conn.cursor()
         cursor.execute("""
             INSERT INTO request_costs 
             (session_id, model, input_tokens, output_tokens, 
-             input_cost, output_cost, total_cost)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
+             input_cost, output_cost, total_cost, timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?,
+                    COALESCE(datetime(?, 'unixepoch'), CURRENT_TIMESTAMP))
         """, (session_id, model, input_tokens, output_tokens,
-              input_cost, output_cost, total_cost))
+              input_cost, output_cost, total_cost, ts))
         self.conn.commit()
         
         logger.debug(f"Logged cost for {model}: {input_tokens} in, {output_tokens} out, ${total_cost:.4f}")
     
+    def log_request_cost_many(self, rows: Iterable[Tuple[str, str, int, int, float, float, float]]) -> None:
+        """Insert already-priced (session_id, model, in, out, in_cost, out_cost, total) rows in one transaction"""
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO request_costs 
+                (session_id, model, input_tokens, output_tokens, 
+                 input_cost, output_cost, total_cost)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+    
+    def log_request_costs_bulk(self, rows: List[Tuple[str, str, int, int, Optional[str]]]) -> int:
+        """Log many (session_id, model, in, out, provider) requests in one transaction; returns the row count"""
+        model_costs_by_key = {}
+        params = []
+        for session_id, model, input_tokens, output_tokens, provider in rows:
+            key = (model, provider)
+            if key not in model_costs_by_key:
+                model_costs_by_key[key] = self._get_model_costs(model, provider)
+            input_cost, output_cost, total_cost = self._calculate_request_cost(
+                model_costs_by_key[key], input_tokens, output_tokens
+            )
+            params.append((session_id, model, input_tokens, output_tokens,
+                           input_cost, output_cost, total_cost))
+        
+        self.log_request_cost_many(params)
+        
+        logger.debug(f"Logged {len(params)} request costs in one transaction")
+        return len(params)
+    
     def get_conversation_cost_summary(self, session_id: str) -> Optional[Dict]:
         """Get cost summary for a specific conversation"""
         cursor = self.conn.cursor()
@@ -228,22 +269,25 @@ class CostTrackingDB(ChatDatabase):
             return dict(row)
         return None
     
+    # Range scan on timestamp served entirely by idx_request_costs_ts_cost
+    DAILY_COSTS_QUERY = """
+        SELECT 
+            DATE(timestamp) as date,
+            model,
+            COUNT(*) as request_count,
+            SUM(input_tokens) as total_input_tokens,
+            SUM(output_tokens) as total_output_tokens,
+            SUM(total_cost) as total_cost
+        FROM request_costs
+        WHERE timestamp >= date('now', '-' || ? || ' days')
+        GROUP BY DATE(timestamp), model
+        ORDER BY date DESC, total_cost DESC
+    """
+    
     def get_daily_costs(self, days: int = 30) -> List[Dict]:
         """Get daily cost breakdown for the last N days"""
         cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT 
-                DATE(timestamp) as date,
-                model,
-                COUNT(*) as request_count,
-                SUM(input_tokens) as total_input_tokens,
-                SUM(output_tokens) as total_output_tokens,
-                SUM(total_cost) as total_cost
-            FROM request_costs
-            WHERE timestamp >= date('now', '-' || ? || ' days')
-            GROUP BY DATE(timestamp), model
-            ORDER BY date DESC, total_cost DESC
-        """, (days,))
+        cursor.execute(self.DAILY_COSTS_QUERY, (days,))
         
         return [dict(row) for row in cursor.fetchall()]
     
@@ -374,6 +418,14 @@ class CostTrackingDB(ChatDatabase):
             'model_usage': self.get_model_usage_stats(),
             'top_conversations': self.get_conversation_rankings(50)
         }
+        if orjson is not None:
+            # Pass datetimes through to default=str so they are written the
+            # same way as by the json fallback (local time, no offset)
+            return orjson.dumps(
+                data,
+                default=str,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_PASSTHROUGH_DATETIME
+            ).decode()
         return json.dumps(data, indent=2, default=str)
     
     def export_costs_csv(self, output_path: str, start_date: Optional[str] = None,
@@ -409,11 +461,12 @@ class CostTrackingDB(ChatDatabase):
         query += " ORDER BY timestamp DESC"
         cursor.execute(query, params)
         
-        with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        # Stream rows straight from the cursor into a large write buffer
+        # rather than materializing the whole result set first
+        with open(output_path, 'w', newline='', encoding='utf-8', buffering=1 << 20) as f:
             writer = csv.writer(f)
-            writer.writerow(['session_id', 'timestamp', 'model', 'input_tokens',
-                           'output_tokens', 'input_cost', 'output_cost', 'total_cost'])
-            writer.writerows(cursor.fetchall())
+            writer.writerow([column[0] for column in cursor.description])
+            writer.writerows(cursor)
         
         logger.info(f"Exported cost data to {output_path}")
     
@@ -490,31 +543,58 @@ class CostTrackingHealthCheck:
     
     def __init__(self, db: CostTrackingDB):
         self.db = db
+        self._schema_objects: Optional[Dict[str, set]] = None
     
-    def check_database_health(self) -> Dict[str, Any]:
-        """Comprehensive health check for cost tracking database"""
-        return {
+    def check_database_health(self, deep: bool = False) -> Dict[str, Any]:
+        """Comprehensive health check for cost tracking database (deep: also run PRAGMA integrity_check)"""
+        if deep:
+            self._schema_objects = None
+        
+        health = {
             'table_integrity': self._check_table_integrity(),
             'index_health': self._check_index_health(),
             'trigger_status': self._check_trigger_status(),
             'data_consistency': self._check_data_consistency(),
             'performance_metrics': self._get_performance_metrics()
         }
+        
+        if deep:
+            health['integrity_check'] = self._run_integrity_check()
+        
+        return health
     
-    def _check_table_integrity(self) -> Dict[str, bool]:
-        """Verify all cost tracking tables exist"""
-        tables = ['model_costs', 'request_costs', 'conversation_costs', 'migration_log']
-        results = {}
+    def _get_schema_objects(self) -> Dict[str, set]:
+        """Get table, index and trigger names from sqlite_master (cached)"""
+        if self._schema_objects is None:
+            cursor = self.db.conn.cursor()
+            cursor.execute("""
+                SELECT type, name FROM sqlite_master 
+                WHERE type IN ('table', 'index', 'trigger')
+            """)
+            
+            schema = {'table': set(), 'index': set(), 'trigger': set()}
+            for row in cursor.fetchall():
+                schema[row['type']].add(row['name'])
+            self._schema_objects = schema
         
+        return self._schema_objects
+    
+    def _run_integrity_check(self) -> Dict[str, Any]:
+        """Run SQLite's full page-level integrity check"""
         cursor = self.db.conn.cursor()
-        for table in tables:
-            cursor.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table' AND name=?
-            """, (table,))
-            results[table] = cursor.fetchone() is not None
+        cursor.execute("PRAGMA integrity_check")
+        messages = [row[0] for row in cursor.fetchall()]
         
-        return results
+        return {
+            'is_ok': messages == ['ok'],
+            'messages': messages
+        }
+    
+    def _check_table_integrity(self) -> Dict[str, bool]:
+        """Verify all cost tracking tables exist"""
+        tables = ['model_costs', 'request_costs', 'conversation_costs', 'migration_log']
+        existing_tables = self._get_schema_objects()['table']
+        return {table: table in existing_tables for table in tables}
     
     def _check_index_health(self) -> Dict[str, bool]:
         """Check if all indexes exist"""
@@ -522,33 +602,22 @@ class CostTrackingHealthCheck:
             'idx_model_costs_provider',
             'idx_model_costs_last_updated',
             'idx_request_costs_session_id',
-            'idx_request_costs_timestamp',
             'idx_request_costs_model',
             'idx_request_costs_session_time',
+            'idx_request_costs_ts_cost',
             'idx_conversation_costs_start_time',
             'idx_conversation_costs_last_update',
             'idx_conversation_costs_total_cost'
         ]
         
-        cursor = self.db.conn.cursor()
-        cursor.execute("""
-            SELECT name FROM sqlite_master 
-            WHERE type='index'
-        """)
-        
-        existing_indexes = {row['name'] for row in cursor.fetchall()}
+        existing_indexes = self._get_schema_objects()['index']
         return {idx: idx in existing_indexes for idx in expected_indexes}
     
     def _check_trigger_status(self) -> Dict[str, bool]:
         """Check if triggers are properly configured"""
-        cursor = self.db.conn.cursor()
-        cursor.execute("""
-            SELECT name FROM sqlite_master 
-            WHERE type='trigger' AND name='update_conversation_costs_on_insert'
-        """)
-        
         return {
-            'update_conversation_costs_on_insert': cursor.fetchone() is not None
+            'update_conversation_costs_on_insert':
+                'update_conversation_costs_on_insert' in self._get_schema_objects()['trigger']
         }
     
     def _check_data_consistency(self) -> Dict[str, Any]:
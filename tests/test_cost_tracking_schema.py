@@ -3,17 +3,23 @@ Test script for cost tracking database schema implementation
 Verifies that all migrations run correctly and the schema functions as expected
 """
 
+import csv
+import importlib.util
 import sys
 import os
 import sqlite3
 import json
-from datetime import datetime
+import tempfile
+from datetime import datetime, timezone
 from pathlib import Path
 
+import pytest
+
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from src.database import cost_tracking
 from src.database.cost_tracking import CostTrackingDB, CostTrackingHealthCheck
 from src.core.cost_tracker import CostTracker, ModelCost, RequestCost
 from src.config import Configuration
@@ -171,6 +177,190 @@ def test_health_check(db: CostTrackingDB):
     print(f"  - Performance metrics: {json.dumps(health['performance_metrics'], indent=4)}")
 
 
+def test_bulk_request_logging():
+    """Test bulk and pre-priced request cost logging"""
+    print("\n\nTesting bulk request logging...")
+    
+    db = CostTrackingDB(":memory:")
+    db.create_session("bulk_session", "openai")
+    db.create_session("single_session", "openai")
+    
+    requests = [
+        ("gpt-4", 1000, 500),
+        ("gpt-3.5-turbo", 2000, 1000),
+        ("gpt-4", 1500, 750)
+    ]
+    
+    inserted = db.log_request_costs_bulk(
+        [("bulk_session", model, inp, out, "openai") for model, inp, out in requests]
+    )
+    for model, inp, out in requests:
+        db.log_request_cost("single_session", model, inp, out, "openai")
+    
+    assert inserted == len(requests)
+    
+    # Bulk rows must be priced exactly like rows logged one at a time
+    def costs_for(session_id):
+        return db.conn.execute("""
+            SELECT model, input_tokens, output_tokens, input_cost, output_cost, total_cost
+            FROM request_costs WHERE session_id = ? ORDER BY id
+        """, (session_id,)).fetchall()
+    
+    bulk_rows = [tuple(row) for row in costs_for("bulk_session")]
+    single_rows = [tuple(row) for row in costs_for("single_session")]
+    assert len(bulk_rows) == len(requests)
+    assert bulk_rows == single_rows
+    print(f"✓ Bulk insert logged {inserted} requests priced like single inserts")
+    
+    # Pre-priced rows are stored as given
+    db.create_session("priced_session", "openai")
+    db.log_request_cost_many(
+        ("priced_session", "gpt-4", 1000, 500, 0.03, 0.03, 0.06) for _ in range(3)
+    )
+    priced_rows = costs_for("priced_session")
+    assert len(priced_rows) == 3
+    assert all(tuple(row)[3:] == (0.03, 0.03, 0.06) for row in priced_rows)
+    print("✓ Pre-priced insert stored 3 rows with the given costs")
+    
+    db.close()
+
+
+def test_request_cost_timestamp():
+    """Test logging a request with an explicit timestamp"""
+    print("\n\nTesting explicit request timestamps...")
+    
+    db = CostTrackingDB(":memory:")
+    db.create_session("ts_session", "openai")
+    
+    ts = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc).timestamp()
+    db.log_request_cost("ts_session", "gpt-4", 1000, 500, "openai", ts=ts)
+    db.log_request_cost("ts_session", "gpt-4", 1000, 500, "openai")
+    
+    stamps = [row[0] for row in db.conn.execute(
+        "SELECT timestamp FROM request_costs WHERE session_id = 'ts_session' ORDER BY id"
+    )]
+    assert stamps[0] == "2024-01-02 03:04:05"
+    assert stamps[1] != stamps[0]  # no ts falls back to CURRENT_TIMESTAMP
+    print(f"✓ Explicit timestamp stored as {stamps[0]}")
+    
+    db.close()
+
+
+def test_deep_health_check():
+    """Test the deep health check and the covering index migration"""
+    print("\n\nTesting deep health check...")
+    
+    db = CostTrackingDB(":memory:")
+    health_check = CostTrackingHealthCheck(db)
+    
+    health = health_check.check_database_health()
+    assert 'integrity_check' not in health
+    
+    health = health_check.check_database_health(deep=True)
+    assert health['integrity_check']['is_ok'], health['integrity_check']['messages']
+    assert health['index_health']['idx_request_costs_ts_cost']
+    print("✓ integrity_check passed")
+    
+    # Migration 007 created the covering index and recorded itself
+    index = db.conn.execute("""
+        SELECT name FROM sqlite_master
+        WHERE type = 'index' AND name = 'idx_request_costs_ts_cost'
+    """).fetchone()
+    assert index is not None
+    applied = db.conn.execute("""
+        SELECT 1 FROM migration_log
+        WHERE migration_id = '007_add_request_costs_covering_index'
+    """).fetchone()
+    assert applied is not None
+    print("✓ Covering index idx_request_costs_ts_cost exists")
+    
+    db.close()
+
+
+def test_request_cost_calculate():
+    """Test pricing a single request with RequestCost.calculate"""
+    print("\n\nTesting RequestCost.calculate...")
+    
+    model_cost = ModelCost("gpt-4", "openai", 0.03, 0.06, 8192)
+    request_cost = RequestCost.calculate(model_cost, 1000, 500, session_id="calc_session")
+    
+    assert abs(float(request_cost.total_cost) - 0.06) < 1e-9
+    assert request_cost.model == "gpt-4"
+    assert request_cost.session_id == "calc_session"
+    print(f"✓ 1000 in / 500 out on gpt-4 costs ${float(request_cost.total_cost):.4f}")
+
+
+def test_request_cost_calculate_batch():
+    """Test that batch pricing matches the scalar calculation"""
+    print("\n\nTesting RequestCost.calculate_batch...")
+    np = pytest.importorskip("numpy")
+    
+    model_cost = ModelCost("gpt-4", "openai", 0.03, 0.06, 8192)
+    input_tokens = [1000, 0, 2500, 123]
+    output_tokens = [500, 750, 0, 4567]
+    
+    batch_costs = RequestCost.calculate_batch(model_cost, input_tokens, output_tokens)
+    scalar_costs = [
+        float(RequestCost.calculate(model_cost, inp, out).total_cost)
+        for inp, out in zip(input_tokens, output_tokens)
+    ]
+    
+    assert batch_costs.shape == (len(input_tokens),)
+    assert np.allclose(batch_costs, scalar_costs)
+    print(f"✓ Batch pricing matches scalar pricing for {len(input_tokens)} requests")
+
+
+def test_csv_export_header():
+    """Test that the CSV export header and row count are unchanged"""
+    print("\n\nTesting CSV export header...")
+    
+    db = CostTrackingDB(":memory:")
+    db.create_session("csv_session", "openai")
+    for model, inp, out in [("gpt-4", 1000, 500), ("gpt-3.5-turbo", 2000, 1000)]:
+        db.log_request_cost("csv_session", model, inp, out, "openai")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = Path(tmp_dir) / "costs.csv"
+        db.export_costs_csv(str(csv_path))
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+    
+    assert rows[0] == ['session_id', 'timestamp', 'model', 'input_tokens',
+                       'output_tokens', 'input_cost', 'output_cost', 'total_cost']
+    assert len(rows) == 1 + 2
+    print(f"✓ CSV export has the expected header and {len(rows) - 1} rows")
+    
+    db.close()
+
+
+def test_json_export_matches_fallback():
+    """Test that the JSON export matches the plain json module output"""
+    print("\n\nTesting JSON export...")
+    
+    db = CostTrackingDB(":memory:")
+    db.create_session("json_session", "openai")
+    for model, inp, out in [("gpt-4", 1000, 500), ("gpt-3.5-turbo", 2000, 1000)]:
+        db.log_request_cost("json_session", model, inp, out, "openai")
+    
+    exported = json.loads(db.export_costs_json())
+    
+    # Export again through the json fallback that is used without orjson
+    saved_orjson = cost_tracking.orjson
+    cost_tracking.orjson = None
+    try:
+        expected = json.loads(db.export_costs_json())
+    finally:
+        cost_tracking.orjson = saved_orjson
+    
+    exported.pop('export_date')
+    expected.pop('export_date')
+    assert exported == expected
+    assert exported['top_conversations'][0]['session_id'] == "json_session"
+    print("✓ JSON export matches the json module output")
+    
+    db.close()
+
+
 def test_cost_tracker():
     """Test the CostTracker class"""
     print("\n\nTesting CostTracker class...")
@@ -267,6 +457,20 @@ def main():
         # Test health check
         test_health_check(db)
         
+        # Test bulk logging, explicit timestamps and deep health check
+        test_bulk_request_logging()
+        test_request_cost_timestamp()
+        test_deep_health_check()
+        
+        # Test request pricing (batch pricing needs NumPy)
+        test_request_cost_calculate()
+        if importlib.util.find_spec("numpy") is not None:
+            test_request_cost_calculate_batch()
+        
+        # Test CSV export format
+        test_csv_export_header()
+        test_json_export_matches_fallback()
+        
         # Test cost tracker
         tracker = test_cost_tracker()
         
@@ -4,15 +4,25 @@ SwarmBot WebSocket Functionality Validation
 """
 import os
 import sys
+
+# Must run before other imports (may monkey-patch)
+from ws_async_mode import select_async_mode
+WS_ASYNC_MODE = select_async_mode()
+
+import ast
 import subprocess
 import json
+import mmap
 from datetime import datetime
+from pathlib import Path
 
 # Add SwarmBot to path
-project_root = r'C:\Users\joelf\OneDrive\Joels Files\Documents\GitHub\SwarmBot'
-os.chdir(project_root)
+project_root = str(Path(__file__).resolve().parent.parent)
 sys.path.insert(0, project_root)
 
+# Block-buffer stdout; flushed at exit
+sys.stdout.reconfigure(line_buffering=False)
+
 print("SwarmBot WebSocket Implementation Validation")
 print("=" * 80)
 print(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -52,10 +62,10 @@ ws_files = {
     "integration.py": "src/ui/dash/integration.py",
     "app.py (with SocketIO)": "src/ui/dash/app.py",
 }
+ws_files = {name: os.path.join(project_root, path) for name, path in ws_files.items()}
 
 for name, path in ws_files.items():
-    full_path = os.path.join(project_root, path)
-    check_step(f"File exists: {name}", os.path.exists(full_path))
+    check_step(f"File exists: {name}", os.path.exists(path))
 
 # 2. Check Test Files
 print("\n2. CHECKING TEST FILES")
@@ -68,10 +78,10 @@ test_files = {
     "test_websocket_performance.py": "tests/test_websocket_performance.py",
     "test_websocket_suite.py": "tests/test_websocket_suite.py"
 }
+test_files = {name: os.path.join(project_root, path) for name, path in test_files.items()}
 
 for name, path in test_files.items():
-    full_path = os.path.join(project_root, path)
-    check_step(f"Test file exists: {name}", os.path.exists(full_path))
+    check_step(f"Test file exists: {name}", os.path.exists(path))
 
 # 3. Check Dependencies
 print("\n3. CHECKING DEPENDENCIES")
@@ -98,23 +108,49 @@ print("-" * 40)
 
 # Check app.py has SocketIO
 try:
-    with open(os.path.join(project_root, "src/ui/dash/app.py"), 'r') as f:
-        app_content = f.read()
-    
-    check_step("app.py imports SocketIO", "from flask_socketio import SocketIO" in app_content)
-    check_step("app.py creates SocketIO instance", "socketio = SocketIO(" in app_content)
-    check_step("app.py has WebSocket client script", "socket.io.js" in app_content)
-    check_step("app.py uses socketio.run()", "socketio.run(" in app_content or ".socketio.run(" in app_content)
+    with open(ws_files["app.py (with SocketIO)"], 'rb') as f:
+        app_tree = ast.parse(f.read(), filename=ws_files["app.py (with SocketIO)"])
+
+    # Single walk over the AST so comments and docstrings cannot satisfy a check
+    imports_socketio = creates_socketio = has_client_script = runs_socketio = False
+    for node in ast.walk(app_tree):
+        if isinstance(node, ast.ImportFrom):
+            if node.module == 'flask_socketio' and any(a.name == 'SocketIO' for a in node.names):
+                imports_socketio = True
+        elif isinstance(node, ast.Assign):
+            value = node.value
+            if (isinstance(value, ast.Call) and isinstance(value.func, ast.Name)
+                    and value.func.id == 'SocketIO'):
+                creates_socketio = True
+        elif isinstance(node, ast.Constant):
+            if isinstance(node.value, str) and 'socket.io.js' in node.value:
+                has_client_script = True
+        elif isinstance(node, ast.Call):
+            func = node.func
+            if isinstance(func, ast.Attribute) and func.attr == 'run':
+                owner = func.value
+                owner_name = owner.attr if isinstance(owner, ast.Attribute) else getattr(owner, 'id', None)
+                if owner_name == 'socketio':
+                    runs_socketio = True
+
+    check_step("app.py imports SocketIO", imports_socketio)
+    check_step("app.py creates SocketIO instance", creates_socketio)
+    check_step("app.py has WebSocket client script", has_client_script)
+    check_step("app.py uses socketio.run()", runs_socketio)
 except Exception as e:
     validation_results["failed"].append(f"Error reading app.py: {e}")
 
 # Check SwarmCoordinator integration
 try:
-    with open(os.path.join(project_root, "src/ui/dash/integration.py"), 'r') as f:
-        integration_content = f.read()
-    
-    check_step("Integration sets event callbacks", "set_event_callbacks" in integration_content)
-    check_step("Integration imports WebSocket events", "from src.ui.dash.websocket_events import" in integration_content)
+    with open(ws_files["integration.py"], 'rb') as f:
+        sets_callbacks = imports_events = False
+        # mmap cannot map an empty file; both checks simply fail then
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as integration_content:
+                sets_callbacks = integration_content.find(b"set_event_callbacks") != -1
+                imports_events = integration_content.find(b"from src.ui.dash.websocket_events import") != -1
+        check_step("Integration sets event callbacks", sets_callbacks)
+        check_step("Integration imports WebSocket events", imports_events)
 except Exception as e:
     validation_results["failed"].append(f"Error reading integration.py: {e}")
 
@@ -128,7 +164,7 @@ try:
     
     app = Flask(__name__)
     app.config['SECRET_KEY'] = 'test'
-    socketio = SocketIO(app, async_mode='threading')
+    socketio = SocketIO(app, async_mode=WS_ASYNC_MODE)
     
     client = socketio.test_client(app)
     check_step("Test client creation", client is not None)
@@ -164,14 +200,20 @@ try:
         if task_35:
             print(f"  Task 35 Status: {task_35.get('status', 'unknown')}")
             
-            # Check subtasks
-            subtask_count = len(task_35.get('subtasks', []))
-            done_count = sum(1 for st in task_35.get('subtasks', []) if st.get('status') == 'done')
-            
+            # Check subtasks (single pass: count done, collect pending)
+            subtasks = task_35.get('subtasks', [])
+            pending = []
+            done_count = 0
+            for st in subtasks:
+                if st.get('status') == 'done':
+                    done_count += 1
+                else:
+                    pending.append(st)
+            subtask_count = len(subtasks)
+
             print(f"  Subtasks: {done_count}/{subtask_count} completed")
-            
+
             # List pending subtasks
-            pending = [st for st in task_35.get('subtasks', []) if st.get('status') != 'done']
             if pending:
                 print(f"  Pending subtasks:")
                 for st in pending:
@@ -248,3 +290,5 @@ print("  python swarmbot.py --ui")
 
 print("\n" + "=" * 80)
 print("Validation Complete!")
+
+sys.stdout.flush()
@@ -1,43 +1,33 @@
 # -*- coding: utf-8 -*-
 """Run sample WebSocket tests to verify fixes"""
-import unittest
+import importlib.util
 import sys
 from pathlib import Path
 
-sys.path.append(str(Path(__file__).parent.parent))
+import pytest
 
-# Import test classes
-from tests.test_websocket_events import TestEventBatcher, TestWebSocketEvents
-from tests.test_websocket_resilience import TestWebSocketResilience
-from tests.test_websocket_integration import TestWebSocketIntegration
-from tests.test_websocket_performance import TestWebSocketPerformance
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
 
 # Test each module with one test
 test_cases = [
-    (TestEventBatcher, 'test_batch_timing'),
-    (TestWebSocketEvents, 'test_connection_handling'),
-    (TestWebSocketResilience, 'test_initial_state'),
-    (TestWebSocketIntegration, 'test_dashboard_integration'),
-    (TestWebSocketPerformance, 'test_metric_batching_efficiency')
+    ('test_websocket_events.py', 'TestEventBatcher', 'test_batch_timing'),
+    ('test_websocket_events.py', 'TestWebSocketEvents', 'test_connection_handling'),
+    ('test_websocket_resilience.py', 'TestWebSocketResilience', 'test_initial_state'),
+    ('test_websocket_integration.py', 'TestWebSocketIntegration', 'test_dashboard_integration'),
+    ('test_websocket_performance.py', 'TestWebSocketPerformance', 'test_metric_batching_efficiency')
+]
+
+nodeids = [
+    f"{project_root / 'tests' / module}::{test_class}::{test_method}"
+    for module, test_class, test_method in test_cases
 ]
 
 print("Running sample tests from each WebSocket test module...\n")
 
-for test_class, test_method in test_cases:
-    print(f"Testing {test_class.__name__}.{test_method}...")
-    suite = unittest.TestSuite()
-    suite.addTest(test_class(test_method))
-    runner = unittest.TextTestRunner(verbosity=0)
-    result = runner.run(suite)
-    
-    if result.wasSuccessful():
-        print(f"  [PASSED]")
-    else:
-        print(f"  [FAILED]")
-        if result.failures:
-            print(f"    Failures: {result.failures}")
-        if result.errors:
-            print(f"    Errors: {result.errors}")
-    print()
+args = ['-x', '-q', '-p', 'no:cacheprovider']
+# Fan the samples out across cores when pytest-xdist is available
+if importlib.util.find_spec('xdist') is not None:
+    args += ['-n', 'auto']
 
-print("Test verification complete.")
+sys.exit(pytest.main([*args, *nodeids]))
@@ -13,13 +13,26 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from src.config import Configuration
+# VERIFY_VERBOSE=1 prints tracebacks
+VERBOSE = os.getenv("VERIFY_VERBOSE", "0") == "1"
+
+from src.config import get_config
 from src.core.context_manager import ConversationContext
 from src.chat_session import ChatSession
 from src.llm_client import LLMClient
 from src.server import Server
 
 
+class MockLLMClient(LLMClient):
+    """Minimal LLM client stand-in for ChatSession construction"""
+
+    def __init__(self):
+        self.provider_name = "mock"
+
+    def get_response(self, messages):
+        return "Mock response"
+
+
 def verify_token_fix():
     """Verify that the token truncation fix is working correctly"""
     print("=" * 60)
@@ -38,7 +51,7 @@ def verify_token_fix():
     
     # 2. Verify Configuration class reads the value
     print("\n2. Checking Configuration class...")
-    config = Configuration()
+    config = get_config()
     if hasattr(config, 'max_context_tokens'):
         print(f"✅ Configuration.max_context_tokens = {config.max_context_tokens}")
     else:
@@ -65,16 +78,21 @@ def verify_token_fix():
     print("\n4. Testing context handling with large token count...")
     
     # Add messages that would exceed 4000 tokens
-    for i in range(50):
+    message_count = 50
+    total_chars = 0
+    for i in range(message_count):
         # Each message is ~100 tokens (400 chars)
         long_message = f"This is message number {i}. " * 20
         context_custom.add_message("user", long_message)
+        total_chars += len(long_message)
     
     # Get context for LLM
     llm_context = context_custom.get_context_for_llm()
     
-    # Count approximate tokens
-    total_chars = sum(len(msg['content']) for msg in llm_context)
+    # Count approximate tokens; the running total is exact unless the
+    # context dropped messages, in which case measure what was kept
+    if len(llm_context) != message_count:
+        total_chars = sum(len(msg['content']) for msg in llm_context)
     approx_tokens = total_chars // 4  # Rough estimate
     
     print(f"   Total messages in context: {len(llm_context)}")
@@ -93,13 +111,6 @@ def verify_token_fix():
     mock_servers = []
     
     # Create a simple mock LLM client
-    class MockLLMClient(LLMClient):
-        def __init__(self):
-            self.provider_name = "mock"
-        
-        def get_response(self, messages):
-            return "Mock response"
-    
     mock_llm = MockLLMClient()
     
     # Create ChatSession with config
@@ -140,12 +151,18 @@ if __name__ == "__main__":
     # Load environment variables
     from dotenv import load_dotenv
     load_dotenv()
-    
+
+    # Block-buffer stdout; the report is flushed when the interpreter exits
+    sys.stdout.reconfigure(line_buffering=False)
+
     try:
         success = verify_token_fix()
         exit(0 if success else 1)
     except Exception as e:
         print(f"\n❌ Verification failed with error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        if VERBOSE:
+            import traceback
+            traceback.print_exc()
+        else:
+            print("   (set VERIFY_VERBOSE=1 for traceback)")
         exit(1)
\ No newline at end of file
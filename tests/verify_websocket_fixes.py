@@ -1,8 +1,17 @@
 # -*- coding: utf-8 -*-
 """Quick test to verify WebSocket test fixes"""
 
+import os
 import sys
 from pathlib import Path
+
+# Must run before other imports (may monkey-patch)
+from ws_async_mode import select_async_mode
+WS_ASYNC_MODE = select_async_mode()
+
+# VERIFY_VERBOSE=1 prints tracebacks
+VERBOSE = os.getenv('VERIFY_VERBOSE', '0') == '1'
+
 sys.path.append(str(Path(__file__).parent.parent))
 
 # Test imports
@@ -38,7 +47,7 @@ try:
     
     app = Flask(__name__)
     app.config['TESTING'] = True
-    socketio = SocketIO(app, async_mode='threading')
+    socketio = SocketIO(app, async_mode=WS_ASYNC_MODE)
     
     client = socketio.test_client(app)
     
@@ -62,7 +71,10 @@ try:
     
 except Exception as e:
     print(f"[ERROR] Basic functionality test failed: {e}")
-    import traceback
-    traceback.print_exc()
+    if VERBOSE:
+        import traceback
+        traceback.print_exc()
+    else:
+        print("  (set VERIFY_VERBOSE=1 for traceback)")
 
 print("\nTest verification complete.")
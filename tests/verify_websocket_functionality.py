@@ -2,14 +2,22 @@
 """
 WebSocket Functionality Verification Script
 """
+import ast
 import os
 import sys
+from pathlib import Path
 
-# Change to the SwarmBot directory
-project_root = r'C:\Users\joelf\OneDrive\Joels Files\Documents\GitHub\SwarmBot'
-os.chdir(project_root)
+# Must run before other imports (may monkey-patch)
+from ws_async_mode import select_async_mode
+WS_ASYNC_MODE = select_async_mode()
+
+# Add SwarmBot to path
+project_root = str(Path(__file__).resolve().parent.parent)
 sys.path.insert(0, project_root)
 
+# Block-buffer stdout; flushed at exit
+sys.stdout.reconfigure(line_buffering=False)
+
 print("SwarmBot WebSocket Functionality Verification")
 print("=" * 60)
 
@@ -41,28 +49,52 @@ try:
 except Exception as e:
     print(f"   ✗ Flask-SocketIO not installed: {e}")
 
+# Tests 3 and 4 inspect src/ui/dash/app.py statically; importing it would
+# build the whole Dash layout and register every callback.
+app_path = os.path.join(project_root, 'src/ui/dash/app.py')
+socketio_calls = []
+init_app_calls = []
+try:
+    with open(app_path, 'rb') as f:
+        app_tree = ast.parse(f.read(), filename=app_path)
+    for node in ast.walk(app_tree):
+        if isinstance(node, ast.Call):
+            if isinstance(node.func, ast.Name) and node.func.id == 'SocketIO':
+                socketio_calls.append(node)
+            elif isinstance(node.func, ast.Attribute) and node.func.attr == 'init_app':
+                init_app_calls.append(node)
+except Exception as e:
+    print(f"\n   ! Could not parse app.py ({e}); falling back to live import")
+
 # Test 3: Check WebSocket server configuration
 print("\n3. Testing WebSocket server setup...")
 try:
-    from src.ui.dash.app import socketio
-    if socketio:
-        print("   ✓ SocketIO instance found in app.py")
+    if socketio_calls:
+        print("   ✓ SocketIO instance created in app.py")
     else:
-        print("   ✗ SocketIO instance not configured")
+        from src.ui.dash.app import socketio
+        if socketio:
+            print("   ✓ SocketIO instance found in app.py")
+        else:
+            print("   ✗ SocketIO instance not configured")
 except Exception as e:
     print(f"   ✗ Could not verify SocketIO setup: {e}")
 
 # Test 4: Check if event handlers are registered
 print("\n4. Testing event handler registration...")
 try:
-    from src.ui.dash.app import app
-    from flask_socketio import SocketIO
-    
-    # Create a test SocketIO instance
-    test_socketio = SocketIO()
-    test_socketio.init_app(app, async_mode='threading')
-    
-    print("   ✓ SocketIO can be initialized with the app")
+    # SocketIO(server, ...) binds the Flask server just like init_app(server)
+    if init_app_calls or any(call.args for call in socketio_calls):
+        print("   ✓ SocketIO is bound to the dashboard Flask server")
+    else:
+        from src.ui.dash.app import app
+        from flask_socketio import SocketIO
+
+        # Create a test SocketIO instance
+        test_socketio = SocketIO()
+        test_socketio.init_app(app, async_mode=WS_ASYNC_MODE)
+
+        print("   ✓ SocketIO can be initialized with the app")
 except Exception as e:
     print(f"   ✗ Event handler registration failed: {e}")
 
@@ -89,7 +121,7 @@ try:
     # Create a minimal test app
     test_app = Flask(__name__)
     test_app.config['SECRET_KEY'] = 'test-secret'
-    test_socketio = SocketIO(test_app, async_mode='threading')
+    test_socketio = SocketIO(test_app, async_mode=WS_ASYNC_MODE)
     
     # Create a test client
     client = test_socketio.test_client(test_app)
@@ -118,7 +150,7 @@ except Exception as e:
 # Test 7: Check dashboard WebSocket client
 print("\n7. Testing dashboard WebSocket client setup...")
 try:
-    with open(os.path.join(project_root, 'src/ui/dash/app.py'), 'r') as f:
+    with open(app_path, 'r') as f:
         app_content = f.read()
         
     if 'socketio.init_app' in app_content or 'SocketIO(' in app_content:
@@ -161,3 +193,5 @@ print("  python -m pytest tests/test_websocket_events.py -v")
 print("  python -m pytest tests/test_websocket_resilience.py -v")
 print("  python -m pytest tests/test_websocket_integration.py -v")
 print("  python -m pytest tests/test_websocket_performance.py -v")
+
+sys.stdout.flush()
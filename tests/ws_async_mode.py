@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""
+Flask-SocketIO async mode selection for the WebSocket check scripts
+
+Import and call select_async_mode() before anything else is imported, since
+eventlet and gevent must monkey-patch the standard library first.
+"""
+import os
+import warnings
+
+
+def select_async_mode() -> str:
+    """Return the SocketIO async mode to use, monkey-patching if it needs it
+
+    The mode comes from WS_ASYNC_MODE (default 'eventlet'). If the requested
+    library is not installed, falls back to 'threading' so the scripts still
+    run on machines and CI images without it.
+    """
+    mode = os.getenv('WS_ASYNC_MODE', 'eventlet')
+    try:
+        if mode == 'eventlet':
+            with warnings.catch_warnings():
+                # eventlet >= 0.40 warns about its own deprecation on import
+                warnings.filterwarnings('ignore', message=r'\s*Eventlet is deprecated')
+                import eventlet
+            eventlet.monkey_patch()
+        elif mode == 'gevent':
+            from gevent import monkey
+            monkey.patch_all()
+    except ImportError:
+        mode = 'threading'
+    return mode
@@ -7,16 +7,26 @@ Comprehensive end-to-end testing of the LLM API Cost Tracking System
 import os
 import sys
 import json
+import logging
+import mmap
 import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Any
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-from src.config import Configuration
+from src.config import Configuration, get_config
 from src.database.cost_tracking import CostTrackingDB, CostTrackingHealthCheck
 from src.core.cost_tracker import CostTracker, ModelCost, RequestCost
 from src.core.budget_monitor import BudgetMonitor
@@ -24,10 +34,73 @@ from src.core.integrated_analyzer import IntegratedAnalyzer
 from src.core.cost_updater import CostUpdater
 from src.llm_client_adapter import LLMClient
 
+# Progress lines go to whichever buffer the current thread is capturing
+# into (see _capture_log), so each test's output stays together even when
+# tests run on worker threads; print_summary writes the buffers in order.
+_capture = threading.local()
+
+
+class _CaptureHandler(logging.Handler):
+    """Append formatted records to the current thread's capture buffer"""
+    
+    def emit(self, record):
+        lines = getattr(_capture, 'lines', None)
+        if lines is None:
+            sys.stdout.write(self.format(record) + "\n")
+        else:
+            lines.append(self.format(record))
+
+
+@contextmanager
+def _capture_log(lines: List[str]):
+    """Route this thread's task96 log records into lines"""
+    previous = getattr(_capture, 'lines', None)
+    _capture.lines = lines
+    try:
+        yield
+    finally:
+        _capture.lines = previous
+
+
+_handler = _CaptureHandler()
+_handler.setFormatter(logging.Formatter("%(message)s"))
+logger = logging.getLogger("task96")
+logger.addHandler(_handler)
+logger.setLevel(logging.INFO)
+logger.propagate = False
+
 
 class Task96Verifier:
     """Comprehensive verification of Task 96 implementation"""
     
+    # (result name, method name) in report order
+    _TESTS = [
+        ('database_initialization', 'test_database_initialization'),
+        ('migrations', 'test_migrations'),
+        ('model_costs', 'test_model_costs'),
+        ('cost_calculations', 'test_cost_calculations'),
+        ('budget_monitoring', 'test_budget_monitoring'),
+        ('cost_tracking_integration', 'test_cost_tracking_integration'),
+        ('configuration', 'test_configuration'),
+        ('export_functionality', 'test_export_functionality'),
+        ('database_health', 'test_database_health'),
+        ('performance', 'test_performance'),
+        ('end_to_end_workflow', 'test_end_to_end_workflow'),
+    ]
+    
+    # Self-contained tests that may run on worker threads; everything else
+    # shares the verifier's sqlite3 connections, which are bound to the
+    # thread that opened them.
+    _PARALLEL_TESTS = frozenset({
+        'cost_calculations',
+        'cost_tracking_integration',
+        'configuration',
+    })
+    
+    # Run once the worker threads have finished, since they share the
+    # configured cost database with cost_tracking_integration
+    _FINAL_TESTS = frozenset({'end_to_end_workflow'})
+    
     def __init__(self):
         self.results = {
             'timestamp': datetime.now().isoformat(),
@@ -38,27 +111,48 @@ class Task96Verifier:
             'recommendations': []
         }
         self.temp_db_path = None
+        self._log_sections: Dict[str, List[str]] = {}  # captured output by test
+        self.file_db = None  # on-disk DB for journal/migration checks
+        self.mem_db = None   # in-memory DB for logic-only tests
         
     def run_all_tests(self) -> Dict[str, Any]:
         """Run all verification tests"""
-        print("🔍 Starting Task 96 Verification...")
-        print("=" * 60)
+        # Output buffers: the run header, then one per test in _TESTS order
+        self._log_sections = {'': []}
+        self._log_sections.update((name, []) for name, _ in self._TESTS)
+        with _capture_log(self._log_sections['']):
+            logger.info("🔍 Starting Task 96 Verification...")
+            logger.info("=" * 60)
+        
+        # Pre-size the results so the report keeps _TESTS order however
+        # the worker threads finish
+        self.results['tests'] = dict.fromkeys(name for name, _ in self._TESTS)
         
         try:
-            # Core functionality tests
-            self.test_database_initialization()
-            self.test_migrations()
-            self.test_model_costs()
-            self.test_cost_calculations()
-            self.test_budget_monitoring()
-            self.test_cost_tracking_integration()
-            self.test_configuration()
-            self.test_export_functionality()
-            self.test_database_health()
-            self.test_performance()
-            
-            # Integration tests
-            self.test_end_to_end_workflow()
+            # Logic-only tests need no persistence; they share an in-memory
+            # DB opened here so it doesn't depend on the on-disk DB opening
+            try:
+                self.mem_db = CostTrackingDB(':memory:')
+            except Exception as e:
+                self.results['critical_issues'].append(f"In-memory test database failed to open: {e}")
+            
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                independent = [
+                    executor.submit(self._run_test, name, method)
+                    for name, method in self._TESTS
+                    if name in self._PARALLEL_TESTS
+                ]
+                
+                for name, method in self._TESTS:
+                    if name not in self._PARALLEL_TESTS and name not in self._FINAL_TESTS:
+                        self._run_test(name, method)
+                
+                for future in independent:
+                    future.result()
+            
+            for name, method in self._TESTS:
+                if name in self._FINAL_TESTS:
+                    self._run_test(name, method)
             
             # Determine overall status
             self._determine_overall_status()
@@ -72,25 +166,52 @@ class Task96Verifier:
         
         return self.results
     
+    def _run_test(self, name: str, method: str):
+        """Run one test method, recording anything it fails to catch"""
+        with _capture_log(self._log_sections[name]):
+            try:
+                getattr(self, method)()
+            except Exception as e:
+                self.results['tests'][name] = {
+                    'status': 'FAIL',
+                    'error': str(e)
+                }
+                self.results['critical_issues'].append(f"{name} test raised: {e}")
+                logger.info(f"❌ {name.replace('_', ' ').title()}: FAIL - {e}")
+    
+    @staticmethod
+    def _require_db(db, kind: str) -> CostTrackingDB:
+        """Return a shared test database, failing clearly if it never opened"""
+        if db is None:
+            raise RuntimeError(f"{kind} test database not initialized")
+        return db
+    
     def test_database_initialization(self):
         """Test database initialization and optimization"""
-        print("\n📁 Testing Database Initialization...")
+        logger.info("\n📁 Testing Database Initialization...")
         
         try:
             # Create temporary database
             with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
                 self.temp_db_path = f.name
             
-            # Initialize database
+            # Initialize database; shared with test_migrations
             db = CostTrackingDB(self.temp_db_path)
+            self.file_db = db
             
-            # Check optimizations
+            # Check optimizations (one cursor for both probes)
             cursor = db.conn.cursor()
-            cursor.execute("PRAGMA journal_mode")
-            journal_mode = cursor.fetchone()[0]
+            try:
+                cursor.execute("PRAGMA journal_mode")
+                journal_mode = cursor.fetchone()[0]
+                
+                cursor.execute("PRAGMA foreign_keys")
+                foreign_keys = cursor.fetchone()[0]
+            finally:
+                cursor.close()
             
-            cursor.execute("PRAGMA foreign_keys")
-            foreign_keys = cursor.fetchone()[0]
+            if journal_mode.lower() != 'wal':
+                raise AssertionError(f"Expected WAL journal mode, got {journal_mode}")
             
             self.results['tests']['database_initialization'] = {
                 'status': 'PASS',
@@ -99,7 +220,7 @@ class Task96Verifier:
                 'db_path': self.temp_db_path
             }
             
-            print("✅ Database initialization: PASS")
+            logger.info("✅ Database initialization: PASS")
             
         except Exception as e:
             self.results['tests']['database_initialization'] = {
@@ -107,14 +228,14 @@ class Task96Verifier:
                 'error': str(e)
             }
             self.results['critical_issues'].append(f"Database initialization failed: {e}")
-            print(f"❌ Database initialization: FAIL - {e}")
+            logger.info(f"❌ Database initialization: FAIL - {e}")
     
     def test_migrations(self):
         """Test database migrations"""
-        print("\n🔄 Testing Database Migrations...")
+        logger.info("\n🔄 Testing Database Migrations...")
         
         try:
-            db = CostTrackingDB(self.temp_db_path)
+            db = self._require_db(self.file_db, "on-disk")
             
             # Check that all expected tables exist
             expected_tables = [
@@ -122,12 +243,17 @@ class Task96Verifier:
                 'budget_alerts', 'notification_queue', 'migration_log'
             ]
             
+            # Let SQLite filter sqlite_master down to the expected names
+            placeholders = ','.join('?' * len(expected_tables))
             cursor = db.conn.cursor()
-            cursor.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table'
-            """)
-            existing_tables = [row[0] for row in cursor.fetchall()]
+            try:
+                cursor.execute(f"""
+                    SELECT name FROM sqlite_master 
+                    WHERE type='table' AND name IN ({placeholders})
+                """, expected_tables)
+                existing_tables = sorted(row[0] for row in cursor.fetchall())
+            finally:
+                cursor.close()
             
             missing_tables = [t for t in expected_tables if t not in existing_tables]
             
@@ -138,14 +264,14 @@ class Task96Verifier:
                     'existing_tables': existing_tables
                 }
                 self.results['critical_issues'].append(f"Missing tables: {missing_tables}")
-                print(f"❌ Migrations: FAIL - Missing tables: {missing_tables}")
+                logger.info(f"❌ Migrations: FAIL - Missing tables: {missing_tables}")
             else:
                 self.results['tests']['migrations'] = {
                     'status': 'PASS',
                     'tables_created': len(existing_tables),
                     'all_tables': existing_tables
                 }
-                print(f"✅ Migrations: PASS - {len(existing_tables)} tables created")
+                logger.info(f"✅ Migrations: PASS - {len(existing_tables)} tables created")
                 
         except Exception as e:
             self.results['tests']['migrations'] = {
@@ -153,11 +279,11 @@ class Task96Verifier:
                 'error': str(e)
             }
             self.results['critical_issues'].append(f"Migration test failed: {e}")
-            print(f"❌ Migrations: FAIL - {e}")
+            logger.info(f"❌ Migrations: FAIL - {e}")
     
     def test_model_costs(self):
         """Test model cost loading and caching"""
-        print("\n💰 Testing Model Costs...")
+        logger.info("\n💰 Testing Model Costs...")
         
         try:
             # Test cost updater
@@ -165,7 +291,7 @@ class Task96Verifier:
             cost_catalog = updater.get_cost_catalog()
             
             # Test database cost loading
-            db = CostTrackingDB(self.temp_db_path)
+            db = self._require_db(self.mem_db, "in-memory")
             all_costs = db.get_all_model_costs()
             
             self.results['tests']['model_costs'] = {
@@ -178,7 +304,7 @@ class Task96Verifier:
                 }
             }
             
-            print(f"✅ Model Costs: PASS - {len(cost_catalog.get('providers', {}))} providers loaded")
+            logger.info(f"✅ Model Costs: PASS - {len(cost_catalog.get('providers', {}))} providers loaded")
             
         except Exception as e:
             self.results['tests']['model_costs'] = {
@@ -186,14 +312,14 @@ class Task96Verifier:
                 'error': str(e)
             }
             self.results['warnings'].append(f"Model cost loading issue: {e}")
-            print(f"⚠️ Model Costs: WARNING - {e}")
+            logger.info(f"⚠️ Model Costs: WARNING - {e}")
     
     def test_cost_calculations(self):
         """Test cost calculation accuracy"""
-        print("\n🧮 Testing Cost Calculations...")
+        logger.info("\n🧮 Testing Cost Calculations...")
         
         try:
-            config = Configuration()
+            config = get_config()
             
             # Test ModelCost class
             model_cost = ModelCost("gpt-4", "openai", 0.03, 0.06, 8192)
@@ -220,7 +346,7 @@ class Task96Verifier:
                     'calculated_cost': float(request_cost.total_cost),
                     'expected_cost': expected_total
                 }
-                print(f"✅ Cost Calculations: PASS - ${float(request_cost.total_cost):.4f}")
+                logger.info(f"✅ Cost Calculations: PASS - ${float(request_cost.total_cost):.4f}")
             else:
                 self.results['tests']['cost_calculations'] = {
                     'status': 'FAIL',
@@ -229,7 +355,7 @@ class Task96Verifier:
                     'difference': abs(float(request_cost.total_cost) - expected_total)
                 }
                 self.results['critical_issues'].append("Cost calculation accuracy issue")
-                print(f"❌ Cost Calculations: FAIL - Expected ${expected_total:.4f}, got ${float(request_cost.total_cost):.4f}")
+                logger.info(f"❌ Cost Calculations: FAIL - Expected ${expected_total:.4f}, got ${float(request_cost.total_cost):.4f}")
                 
         except Exception as e:
             self.results['tests']['cost_calculations'] = {
@@ -237,15 +363,15 @@ class Task96Verifier:
                 'error': str(e)
             }
             self.results['critical_issues'].append(f"Cost calculation test failed: {e}")
-            print(f"❌ Cost Calculations: FAIL - {e}")
+            logger.info(f"❌ Cost Calculations: FAIL - {e}")
     
     def test_budget_monitoring(self):
         """Test budget monitoring and alerts"""
-        print("\n💸 Testing Budget Monitoring...")
+        logger.info("\n💸 Testing Budget Monitoring...")
         
         try:
-            config = Configuration()
-            db = CostTrackingDB(self.temp_db_path)
+            config = get_config()
+            db = self._require_db(self.mem_db, "in-memory")
             
             # Test budget monitor
             monitor = BudgetMonitor(config, db)
@@ -254,9 +380,11 @@ class Task96Verifier:
             session_id = f"test_budget_session_{int(time.time())}"
             db.create_session(session_id, "test_provider")
             
-            # Log some costs to trigger budget check
-            db.log_request_cost(session_id, "gpt-4", 1000, 500, "openai")
-            db.log_request_cost(session_id, "gpt-4", 2000, 1000, "openai")
+            # Log some costs to trigger budget check (one transaction)
+            db.log_request_costs_bulk([
+                (session_id, "gpt-4", 1000, 500, "openai"),
+                (session_id, "gpt-4", 2000, 1000, "openai"),
+            ])
             
             # Check budget status
             status = monitor.check_budget_status()
@@ -268,7 +396,7 @@ class Task96Verifier:
                 'test_session_created': session_id
             }
             
-            print("✅ Budget Monitoring: PASS")
+            logger.info("✅ Budget Monitoring: PASS")
             
         except Exception as e:
             self.results['tests']['budget_monitoring'] = {
@@ -276,15 +404,15 @@ class Task96Verifier:
                 'error': str(e)
             }
             self.results['warnings'].append(f"Budget monitoring issue: {e}")
-            print(f"⚠️ Budget Monitoring: WARNING - {e}")
+            logger.info(f"⚠️ Budget Monitoring: WARNING - {e}")
     
     def test_cost_tracking_integration(self):
         """Test integration with LLM client"""
-        print("\n🔗 Testing Cost Tracking Integration...")
+        logger.info("\n🔗 Testing Cost Tracking Integration...")
         
         try:
             # Test if cost tracking can be initialized
-            config = Configuration()
+            config = get_config()
             
             # Mock test without actual LLM call
             analyzer = IntegratedAnalyzer(config)
@@ -310,7 +438,7 @@ class Task96Verifier:
                 'analyzer_initialized': True
             }
             
-            print("✅ Cost Tracking Integration: PASS")
+            logger.info("✅ Cost Tracking Integration: PASS")
             
         except Exception as e:
             self.results['tests']['cost_tracking_integration'] = {
@@ -318,13 +446,14 @@ class Task96Verifier:
                 'error': str(e)
             }
             self.results['critical_issues'].append(f"Cost tracking integration failed: {e}")
-            print(f"❌ Cost Tracking Integration: FAIL - {e}")
+            logger.info(f"❌ Cost Tracking Integration: FAIL - {e}")
     
     def test_configuration(self):
         """Test configuration loading"""
-        print("\n⚙️ Testing Configuration...")
+        logger.info("\n⚙️ Testing Configuration...")
         
         try:
+            # Build a fresh instance rather than the shared cached one
             config = Configuration()
             
             # Check if cost tracking config is available
@@ -332,14 +461,22 @@ class Task96Verifier:
             cost_threshold = getattr(config, 'COST_ALERT_THRESHOLD', None)
             
             # Check .env.example for cost tracking variables
+            # (mapped read-only so both lookups scan the bytes in place)
             env_example_path = Path(__file__).parent / ".env.example"
-            env_example_exists = env_example_path.exists()
-            
+            env_example_exists = False
             cost_config_documented = False
-            if env_example_exists:
-                with open(env_example_path, 'r') as f:
-                    content = f.read()
-                    cost_config_documented = "TRACK_COSTS" in content and "COST_ALERT_THRESHOLD" in content
+            try:
+                with open(env_example_path, 'rb') as f:
+                    env_example_exists = True
+                    # mmap cannot map an empty file
+                    if os.fstat(f.fileno()).st_size:
+                        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                            cost_config_documented = (
+                                mm.find(b"TRACK_COSTS") != -1
+                                and mm.find(b"COST_ALERT_THRESHOLD") != -1
+                            )
+            except FileNotFoundError:
+                pass
             
             self.results['tests']['configuration'] = {
                 'status': 'PASS',
@@ -352,7 +489,7 @@ class Task96Verifier:
             if not cost_config_documented:
                 self.results['warnings'].append("Cost tracking not fully documented in .env.example")
             
-            print("✅ Configuration: PASS")
+            logger.info("✅ Configuration: PASS")
             
         except Exception as e:
             self.results['tests']['configuration'] = {
@@ -360,18 +497,18 @@ class Task96Verifier:
                 'error': str(e)
             }
             self.results['warnings'].append(f"Configuration test issue: {e}")
-            print(f"⚠️ Configuration: WARNING - {e}")
+            logger.info(f"⚠️ Configuration: WARNING - {e}")
     
     def test_export_functionality(self):
         """Test data export capabilities"""
-        print("\n📤 Testing Export Functionality...")
+        logger.info("\n📤 Testing Export Functionality...")
         
         try:
-            db = CostTrackingDB(self.temp_db_path)
+            db = self._require_db(self.mem_db, "in-memory")
             
             # Test JSON export
             json_export = db.export_costs_json()
-            export_data = json.loads(json_export)
+            export_data = orjson.loads(json_export) if orjson else json.loads(json_export)
             
             # Test CSV export
             with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
@@ -391,7 +528,7 @@ class Task96Verifier:
             if csv_exists:
                 os.unlink(csv_path)
             
-            print("✅ Export Functionality: PASS")
+            logger.info("✅ Export Functionality: PASS")
             
         except Exception as e:
             self.results['tests']['export_functionality'] = {
@@ -399,17 +536,19 @@ class Task96Verifier:
                 'error': str(e)
             }
             self.results['warnings'].append(f"Export functionality issue: {e}")
-            print(f"⚠️ Export Functionality: WARNING - {e}")
+            logger.info(f"⚠️ Export Functionality: WARNING - {e}")
     
     def test_database_health(self):
         """Test database health check system"""
-        print("\n🏥 Testing Database Health...")
+        logger.info("\n🏥 Testing Database Health...")
         
         try:
-            db = CostTrackingDB(self.temp_db_path)
+            db = self._require_db(self.mem_db, "in-memory")
             health_check = CostTrackingHealthCheck(db)
             
-            health_status = health_check.check_database_health()
+            # Fast path: schema and consistency checks without a full
+            # integrity_check page scan
+            health_status = health_check.check_database_health(deep=False)
             
             # Check if all health check components are working
             required_checks = ['table_integrity', 'index_health', 'trigger_status', 'data_consistency']
@@ -421,7 +560,7 @@ class Task96Verifier:
                 'all_checks_present': all_checks_present
             }
             
-            print("✅ Database Health: PASS")
+            logger.info("✅ Database Health: PASS")
             
         except Exception as e:
             self.results['tests']['database_health'] = {
@@ -429,44 +568,121 @@ class Task96Verifier:
                 'error': str(e)
             }
             self.results['warnings'].append(f"Database health check issue: {e}")
-            print(f"⚠️ Database Health: WARNING - {e}")
+            logger.info(f"⚠️ Database Health: WARNING - {e}")
     
     def test_performance(self):
         """Test performance characteristics"""
-        print("\n⚡ Testing Performance...")
+        logger.info("\n⚡ Testing Performance...")
         
         try:
-            db = CostTrackingDB(self.temp_db_path)
+            db = self._require_db(self.mem_db, "in-memory")
             
             # Test bulk insert performance
-            session_id = f"perf_test_{int(time.time())}"
+            ts = time.time()
+            session_id = f"perf_test_{int(ts)}"
             db.create_session(session_id, "performance_test")
             
-            start_time = time.time()
+            start = time.perf_counter_ns()
             
-            # Insert 100 cost records
+            # Insert 100 cost records, one transaction each
             for i in range(100):
-                db.log_request_cost(session_id, "gpt-4", 1000, 500, "openai")
+                db.log_request_cost(session_id, "gpt-4", 1000, 500, "openai", ts=ts)
+            
+            single_insert_time = (time.perf_counter_ns() - start) / 1e9
             
-            insert_time = time.time() - start_time
+            # Insert 100 cost records in a single transaction
+            rows = [(session_id, "gpt-4", 1000, 500, "openai")] * 100
+            start = time.perf_counter_ns()
+            db.log_request_costs_bulk(rows)
+            insert_time = (time.perf_counter_ns() - start) / 1e9
+            records_inserted = 200
+            
+            # Price the same 100 requests in one vectorized pass and check
+            # it agrees with the scalar calculation
+            model_cost = ModelCost("gpt-4", "openai", 0.03, 0.06, 8192)
+            scalar = RequestCost.calculate(model_cost, 1000, 500)
+            scalar_cost = scalar.total_cost
+            try:
+                import numpy as np
+                in_toks = np.full(100, 1000, dtype=np.int64)
+                out_toks = np.full(100, 500, dtype=np.int64)
+                start = time.perf_counter_ns()
+                batch_costs = RequestCost.calculate_batch(model_cost, in_toks, out_toks)
+                batch_cost_time = (time.perf_counter_ns() - start) / 1e9
+                batch_matches_scalar = bool(np.allclose(batch_costs, scalar_cost))
+                
+                # Insert the batch-priced rows through one prepared statement
+                in_costs = in_toks * (float(model_cost.input_cost_per_1k) * 1e-3)
+                out_costs = out_toks * (float(model_cost.output_cost_per_1k) * 1e-3)
+                priced_rows = [
+                    (session_id, "gpt-4", i, o, ic, oc, tc)
+                    for i, o, ic, oc, tc in zip(in_toks.tolist(), out_toks.tolist(),
+                                                in_costs.tolist(), out_costs.tolist(),
+                                                batch_costs.tolist())
+                ]
+                start = time.perf_counter_ns()
+                db.log_request_cost_many(priced_rows)
+                priced_insert_time = (time.perf_counter_ns() - start) / 1e9
+                records_inserted += len(priced_rows)
+            except ImportError:
+                batch_cost_time = None
+                batch_matches_scalar = None
+                priced_insert_time = None
+            
+            # Measure sustained insert throughput at a size where per-row
+            # overhead dominates; the generator feeds executemany lazily so
+            # no 10k-element parameter list is built
+            n_streamed = 10_000
+            priced_row = (session_id, "gpt-4", 1000, 500, float(scalar.input_cost),
+                          float(scalar.output_cost), float(scalar.total_cost))
+            start = time.perf_counter_ns()
+            db.log_request_cost_many(priced_row for _ in range(n_streamed))
+            streamed_insert_time = (time.perf_counter_ns() - start) / 1e9
+            streamed_rows_per_second = n_streamed / streamed_insert_time if streamed_insert_time else None
+            records_inserted += n_streamed
             
             # Test query performance
-            start_time = time.time()
+            start = time.perf_counter_ns()
             daily_costs = db.get_daily_costs(30)
-            query_time = time.time() - start_time
+            query_time = (time.perf_counter_ns() - start) / 1e9
+            
+            # The daily rollup should be an index range scan, not a table scan
+            plan = ' '.join(
+                row[3] for row in db.conn.execute(
+                    "EXPLAIN QUERY PLAN " + db.DAILY_COSTS_QUERY, (30,)
+                )
+            )
+            daily_costs_uses_index = 'SEARCH' in plan
             
             self.results['tests']['performance'] = {
                 'status': 'PASS',
+                'single_insert_time_seconds': single_insert_time,
                 'bulk_insert_time_seconds': insert_time,
+                'batch_cost_time_seconds': batch_cost_time,
+                'batch_cost_matches_scalar': batch_matches_scalar,
+                'priced_insert_time_seconds': priced_insert_time,
+                'streamed_insert_rows': n_streamed,
+                'streamed_insert_time_seconds': streamed_insert_time,
+                'streamed_insert_rows_per_second': streamed_rows_per_second,
                 'query_time_seconds': query_time,
-                'records_inserted': 100,
+                'daily_costs_query_plan': plan,
+                'daily_costs_uses_index': daily_costs_uses_index,
+                'records_inserted': records_inserted,
                 'query_results_count': len(daily_costs)
             }
             
+            if not daily_costs_uses_index:
+                self.results['warnings'].append(f"Daily cost query is not using an index: {plan}")
+            
+            if batch_matches_scalar is False:
+                self.results['warnings'].append("Vectorized cost calculation disagrees with scalar path")
+            
             if insert_time > 5.0:
                 self.results['warnings'].append(f"Bulk insert performance slow: {insert_time:.2f}s for 100 records")
             
-            print(f"✅ Performance: PASS - Insert: {insert_time:.3f}s, Query: {query_time:.3f}s")
+            logger.info(f"✅ Performance: PASS - Insert: {single_insert_time:.3f}s single / "
+                        f"{insert_time:.3f}s bulk / {streamed_rows_per_second or 0:,.0f} rows/s streamed, "
+                        f"Query: {query_time:.3f}s")
             
         except Exception as e:
             self.results['tests']['performance'] = {
@@ -474,15 +690,15 @@ class Task96Verifier:
                 'error': str(e)
             }
             self.results['warnings'].append(f"Performance test issue: {e}")
-            print(f"⚠️ Performance: WARNING - {e}")
+            logger.info(f"⚠️ Performance: WARNING - {e}")
     
     def test_end_to_end_workflow(self):
         """Test complete end-to-end workflow"""
-        print("\n🔄 Testing End-to-End Workflow...")
+        logger.info("\n🔄 Testing End-to-End Workflow...")
         
         try:
             # Simulate a complete workflow
-            config = Configuration()
+            config = get_config()
             
             # 1. Initialize cost tracking
             tracker = CostTracker(config)
@@ -520,10 +736,10 @@ class Task96Verifier:
             }
             
             if workflow_successful:
-                print("✅ End-to-End Workflow: PASS")
+                logger.info("✅ End-to-End Workflow: PASS")
             else:
                 self.results['critical_issues'].append("End-to-end workflow failed")
-                print("❌ End-to-End Workflow: FAIL")
+                logger.info("❌ End-to-End Workflow: FAIL")
                 
         except Exception as e:
             self.results['tests']['end_to_end_workflow'] = {
@@ -531,19 +747,19 @@ class Task96Verifier:
                 'error': str(e)
             }
             self.results['critical_issues'].append(f"End-to-end workflow failed: {e}")
-            print(f"❌ End-to-End Workflow: FAIL - {e}")
+            logger.info(f"❌ End-to-End Workflow: FAIL - {e}")
     
     def _determine_overall_status(self):
         """Determine overall test status"""
-        test_results = [test.get('status', 'UNKNOWN') for test in self.results['tests'].values()]
+        observed = {(test or {}).get('status', 'UNKNOWN') for test in self.results['tests'].values()}
         
         if self.results['critical_issues']:
             self.results['overall_status'] = 'CRITICAL_ISSUES'
-        elif 'FAIL' in test_results:
+        elif 'FAIL' in observed:
             self.results['overall_status'] = 'FAILED'
-        elif 'PARTIAL' in test_results or self.results['warnings']:
+        elif 'PARTIAL' in observed or self.results['warnings']:
             self.results['overall_status'] = 'WARNING'
-        elif all(status == 'PASS' for status in test_results):
+        elif observed <= {'PASS'}:
             self.results['overall_status'] = 'PASS'
         else:
             self.results['overall_status'] = 'UNKNOWN'
@@ -560,6 +776,11 @@ class Task96Verifier:
     
     def _cleanup(self):
         """Clean up temporary resources"""
+        for db in (self.file_db, self.mem_db):
+            if db is not None:
+                db.conn.close()
+        self.file_db = self.mem_db = None
+        
         if self.temp_db_path and os.path.exists(self.temp_db_path):
             try:
                 os.unlink(self.temp_db_path)
@@ -567,10 +788,8 @@ class Task96Verifier:
                 pass  # Best effort cleanup
     
     def print_summary(self):
-        """Print verification summary"""
-        print("\n" + "=" * 60)
-        print("📋 TASK 96 VERIFICATION SUMMARY")
-        print("=" * 60)
+        """Print buffered test output followed by the verification summary"""
+        lines = ["", "=" * 60, "📋 TASK 96 VERIFICATION SUMMARY", "=" * 60]
         
         # Overall status
         status_emoji = {
@@ -582,34 +801,42 @@ class Task96Verifier:
         }
         
         emoji = status_emoji.get(self.results['overall_status'], '❓')
-        print(f"\n{emoji} Overall Status: {self.results['overall_status']}")
+        lines.append(f"\n{emoji} Overall Status: {self.results['overall_status']}")
         
         # Test results
-        print(f"\n📊 Test Results ({len(self.results['tests'])} tests):")
+        lines.append(f"\n📊 Test Results ({len(self.results['tests'])} tests):")
         for test_name, test_result in self.results['tests'].items():
-            status = test_result.get('status', 'UNKNOWN')
+            status = (test_result or {}).get('status', 'UNKNOWN')
             emoji = status_emoji.get(status, '❓')
-            print(f"  {emoji} {test_name.replace('_', ' ').title()}: {status}")
+            lines.append(f"  {emoji} {test_name.replace('_', ' ').title()}: {status}")
         
         # Issues and warnings
         if self.results['critical_issues']:
-            print(f"\n🚨 Critical Issues ({len(self.results['critical_issues'])}):")
+            lines.append(f"\n🚨 Critical Issues ({len(self.results['critical_issues'])}):")
             for issue in self.results['critical_issues']:
-                print(f"  • {issue}")
+                lines.append(f"  • {issue}")
         
         if self.results['warnings']:
-            print(f"\n⚠️ Warnings ({len(self.results['warnings'])}):")
+            lines.append(f"\n⚠️ Warnings ({len(self.results['warnings'])}):")
             for warning in self.results['warnings']:
-                print(f"  • {warning}")
+                lines.append(f"  • {warning}")
         
         # Recommendations
         if self.results['recommendations']:
-            print(f"\n💡 Recommendations:")
+            lines.append(f"\n💡 Recommendations:")
             for rec in self.results['recommendations']:
-                print(f"  • {rec}")
+                lines.append(f"  • {rec}")
         
-        print(f"\n📅 Verification completed at: {self.results['timestamp']}")
-        print("=" * 60)
+        lines.append(f"\n📅 Verification completed at: {self.results['timestamp']}")
+        lines.append("=" * 60)
+        
+        sys.stdout.write("".join(
+            line + "\n" for section in self._log_sections.values() for line in section
+        ))
+        sys.stdout.write("\n".join(lines) + "\n")
+        
+        # The captured output has been written; don't repeat it next time
+        self._log_sections = {}
 
 
 def main():
@@ -620,8 +847,15 @@ def main():
     
     # Save results to file
     results_path = Path(__file__).parent / "task_96_verification_results.json"
-    with open(results_path, 'w') as f:
-        json.dump(results, f, indent=2, default=str)
+    if orjson is not None:
+        results_path.write_bytes(orjson.dumps(
+            results,
+            default=str,
+            option=orjson.OPT_INDENT_2
+        ))
+    else:
+        with open(results_path, 'w') as f:
+            json.dump(results, f, indent=2, default=str)
     
     print(f"\n💾 Detailed results saved to: {results_path}")
     